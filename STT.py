@@ -48,17 +48,26 @@ from groq import Groq
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq 
 from langchain_core.prompts import PromptTemplate
+from rate_limiter import scheduler, PRIORITY_LIVE
 
 load_dotenv()
 
-def transcribe_audio(audio_filepath):
+STT_MODEL = "distil-whisper-large-v3-en"
+
+def transcribe_audio(audio_filepath, priority=PRIORITY_LIVE):
     client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    with open(audio_filepath, "rb") as audio_file:
-        transcription = client.audio.transcriptions.create(
-            model="distil-whisper-large-v3-en",
-            file=audio_file,
-            language="en"
-        )
+
+    def _transcribe():
+        with open(audio_filepath, "rb") as audio_file:
+            raw = client.audio.transcriptions.with_raw_response.create(
+                model=STT_MODEL,
+                file=audio_file,
+                language="en"
+            )
+        scheduler.update_from_headers("groq", STT_MODEL, raw.headers)
+        return raw.parse()
+
+    transcription = scheduler.run("groq", STT_MODEL, _transcribe, priority=priority)
     return transcription.text
 
 # print(transcribe_audio("voice_test.mp3"))
@@ -39,9 +39,15 @@ load_dotenv()
 import subprocess
 import platform
 import os
+import math
 from gtts import gTTS
+from rate_limiter import scheduler, PRIORITY_LIVE
 
-def text_to_speech_with_gtts(input_text, output_filepath, play_audio=False):
+# gTTS sends one request per text chunk of at most this many characters
+# (gTTS.GOOGLE_TTS_MAX_CHARS)
+TTS_CHUNK_CHARS = 100
+
+def text_to_speech_with_gtts(input_text, output_filepath, play_audio=False, priority=PRIORITY_LIVE):
     """
     Convert text to speech and optionally play it
     
@@ -49,6 +55,7 @@ def text_to_speech_with_gtts(input_text, output_filepath, play_audio=False):
         input_text (str): Text to convert to speech
         output_filepath (str): Path to save the audio file
         play_audio (bool): Whether to play the audio after generation
+        priority (int): Scheduler priority (PRIORITY_LIVE or PRIORITY_BATCH)
     """
     language = "en"
 
@@ -57,7 +64,13 @@ def text_to_speech_with_gtts(input_text, output_filepath, play_audio=False):
         lang=language,
         slow=False
     )
-    audioobj.save(output_filepath)
+    chunks = max(1, math.ceil(len(input_text) / TTS_CHUNK_CHARS))
+    scheduler.run(
+        "gtts", language,
+        lambda: audioobj.save(output_filepath),
+        priority=priority,
+        requests=chunks
+    )
     
     if play_audio:
         os_name = platform.system()
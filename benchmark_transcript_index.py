@@ -0,0 +1,91 @@
+"""
+Benchmark TranscriptIndex memory and query latency on synthetic transcripts
+
+    python benchmark_transcript_index.py --sessions 20000 --messages 10 --words 25
+"""
+import argparse
+import itertools
+import random
+import time
+import tracemalloc
+
+from transcript_index import TranscriptIndex
+
+TOPIC_TERMS = ["pytorch", "overfitting", "tensorflow", "regularization", "gradient", "descent"]
+
+QUERIES = [
+    "pytorch",
+    "pytorch overfitting",
+    '"gradient descent"',
+    '"gradient descent" pytorch',
+    "tensorflow regularization overfitting",
+    "w17",
+    "w17 w4242",
+]
+
+
+def build_vocabulary(size: int) -> list:
+    return [f"w{i}" for i in range(size)]
+
+
+def generate_message(rng: random.Random, vocabulary: list, cum_weights: list, words: int) -> str:
+    tokens = rng.choices(vocabulary, cum_weights=cum_weights, k=words)
+    # Roughly a third of messages mention a topic term, sometimes as a phrase
+    if rng.random() < 0.3:
+        tokens[rng.randrange(words)] = rng.choice(TOPIC_TERMS)
+    if rng.random() < 0.05:
+        position = rng.randrange(words - 1)
+        tokens[position:position + 2] = ["gradient", "descent"]
+    return " ".join(tokens)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript search")
+    parser.add_argument("--sessions", type=int, default=20000)
+    parser.add_argument("--messages", type=int, default=10)
+    parser.add_argument("--words", type=int, default=25)
+    parser.add_argument("--vocabulary", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    vocabulary = build_vocabulary(args.vocabulary)
+    # Zipf-like term distribution, as in natural language
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(args.vocabulary)))
+    sessions = [
+        [generate_message(rng, vocabulary, cum_weights, args.words) for _ in range(args.messages)]
+        for _ in range(args.sessions)
+    ]
+
+    tracemalloc.start()
+    index = TranscriptIndex()
+    start = time.perf_counter()
+    for number, messages in enumerate(sessions):
+        index.add_session(f"session-{number}", messages)
+    build = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tokens = index.total_length
+    print(f"indexed {len(index)} sessions, {tokens} tokens in {build:.1f}s")
+    print(f"index memory: {memory / 1e6:.1f} MB ({memory / tokens:.1f} bytes/token)")
+    print(f"{'query':<40} {'results':>8} {'median':>9} {'max':>9}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = index.search(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(
+            f"{query:<40} {len(results):>8} {timings[len(timings) // 2] * 1000:>7.2f}ms "
+            f"{timings[-1] * 1000:>7.2f}ms"
+        )
+
+    start = time.perf_counter()
+    index.remove_session("session-0")
+    print(f"remove_session: {(time.perf_counter() - start) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
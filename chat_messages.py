@@ -0,0 +1,136 @@
+import json
+import sys
+import time
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, TextIO
+
+CORE_KEYS = ("role", "content", "timestamp")
+
+
+def _parse_local_iso(value) -> Optional[float]:
+    """Epoch seconds for a naive local ISO string, or None unless it round-trips exactly"""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        return None
+    timestamp = parsed.timestamp()
+    if datetime.fromtimestamp(timestamp).isoformat() != value:
+        return None
+    return timestamp
+
+
+class Message:
+    """Compact chat message: interned role, epoch-float timestamp, optional metadata
+
+    `timestamp` is None for stored records that had no parseable local timestamp;
+    use Message.now() for new messages stamped with the current time.
+    """
+
+    __slots__ = ("role", "content", "timestamp", "metadata")
+
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: Optional[float] = None,
+        metadata: Optional[Dict] = None
+    ):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = timestamp
+        # Most messages carry no metadata, so keep None instead of empty dicts
+        self.metadata = dict(metadata) if metadata else None
+
+    @classmethod
+    def now(cls, role: str, content: str, metadata: Optional[Dict] = None) -> "Message":
+        """New message timestamped with the current time"""
+        return cls(role, content, time.time(), metadata)
+
+    def to_dict(self) -> Dict:
+        """Same layout add_message used to store: core keys, then metadata merged in"""
+        message = {"role": self.role, "content": self.content}
+        if self.timestamp is not None:
+            message["timestamp"] = datetime.fromtimestamp(self.timestamp).isoformat()
+        if self.metadata:
+            message.update(self.metadata)
+        return message
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Message":
+        timestamp = _parse_local_iso(data.get("timestamp"))
+        # Aware, non-ISO or otherwise lossy timestamps stay verbatim in metadata
+        core = ("role", "content") if timestamp is None else CORE_KEYS
+        metadata = {key: value for key, value in data.items() if key not in core}
+        return cls(data.get("role", ""), data.get("content", ""), timestamp, metadata)
+
+    def __repr__(self) -> str:
+        return f"Message({self.to_dict()!r})"
+
+
+class HistoryView(Sequence):
+    """Read-only list-of-dicts view over Message objects, converted on access"""
+
+    __slots__ = ("_messages",)
+
+    def __init__(self, messages: List[Message]):
+        self._messages = messages
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return HistoryView(self._messages[index])
+        return self._messages[index].to_dict()
+
+    def __iter__(self):
+        for message in self._messages:
+            yield message.to_dict()
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, HistoryView):
+            other = list(other)
+        return list(self) == other
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def to_list(self) -> List[Dict]:
+        return list(self)
+
+
+def encode_session(messages: List[Message]) -> str:
+    """JSON text of one session, indented as it appears inside chat_history.json"""
+    text = json.dumps([message.to_dict() for message in messages], indent=2)
+    return text.replace("\n", "\n  ")
+
+
+def write_sessions(f: TextIO, sessions: Dict[str, List[Message]]):
+    """
+    Write sessions as json.dump(..., indent=2) would, one session at a time
+
+    Only one session's dicts and text exist at once, so saving never holds
+    the whole history in the old dict representation.
+    """
+    if not sessions:
+        f.write("{}")
+        return
+    separator = "{\n"
+    for session_id, messages in sessions.items():
+        f.write(f"{separator}  {json.dumps(session_id)}: {encode_session(messages)}")
+        separator = ",\n"
+    f.write("\n}")
+
+
+def deserialize_sessions(data: Dict[str, Iterable[Dict]]) -> Dict[str, List[Message]]:
+    """Build compact sessions from the JSON layout of chat_history.json"""
+    from_dict = Message.from_dict
+    return {
+        session_id: [from_dict(message) for message in messages]
+        for session_id, messages in data.items()
+    }
@@ -0,0 +1,434 @@
+"""
+Open-loop load generator for the interview pipeline (STT -> chat -> TTS)
+
+Simulated candidates arrive as a Poisson process and each replays the fixture
+audio and scripted turns through transcribe_audio, chat_with_bot and
+text_to_speech_with_gtts. By default the Groq, ChatGroq and gTTS calls are
+swapped for local stand-ins with simulated latency, so only our own code
+(scheduler, history, file IO) is measured.
+
+    python load_generator.py --rates 0.5,1,2,4,8 --duration 60
+"""
+import argparse
+import itertools
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from rate_limiter import scheduler, DEFAULT_LIMITS, estimate_tokens
+
+STAGES = ("stt", "chat", "tts", "turn")
+
+DEFAULT_SCRIPT = [
+    "Hello, I'm ready to start the interview.",
+    "I'm a third year BTech student in AI and Data Science with a three month ML internship.",
+    "Overfitting is when a model memorizes training data; I use regularization, dropout and early stopping.",
+    "In PyTorch I write a custom Dataset, a DataLoader and a training loop with an optimizer step.",
+    "For imbalanced data I look at precision, recall and the ROC AUC instead of plain accuracy.",
+    "My internship project was a churn model built with scikit-learn and deployed behind a Flask API.",
+]
+
+# Per-thread turn text the STT stand-in "recognizes" from the fixture audio
+_current_turn = threading.local()
+
+
+def _simulate(base: float, jitter: float):
+    time.sleep(max(0.0, random.gauss(base, jitter)))
+
+
+class _StandInTranscription:
+    def __init__(self, text: str):
+        self.headers = {}
+        self._text = text
+
+    def parse(self):
+        return SimpleNamespace(text=self._text)
+
+
+class StandInGroq:
+    """Replaces groq.Groq in STT.py: reads the audio file and returns the scripted turn"""
+
+    latency = (0.3, 0.05)
+
+    def __init__(self, api_key: Optional[str] = None):
+        create = SimpleNamespace(create=self._create)
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(with_raw_response=create))
+
+    def _create(self, model: str, file, language: str = "en"):
+        file.read()
+        _simulate(*self.latency)
+        return _StandInTranscription(getattr(_current_turn, "text", ""))
+
+
+class StandInGTTS:
+    """Replaces gtts.gTTS in TTS.py: writes a fake MP3 sized like the real one"""
+
+    GOOGLE_TTS_MAX_CHARS = 100
+    latency = (0.4, 0.1)
+
+    def __init__(self, text: str, lang: str = "en", slow: bool = False):
+        self.text = text
+
+    def save(self, output_filepath: str):
+        _simulate(*self.latency)
+        with open(output_filepath, "wb") as f:
+            # gTTS output is roughly 1 KB per 15 characters at 32 kbps
+            f.write(b"\0" * (len(self.text) * 70))
+
+
+def stand_in_chat(prompt_value):
+    """Replaces the ChatGroq step of response.chain_with_history"""
+    from langchain_core.messages import AIMessage
+
+    prompt_tokens = estimate_tokens(prompt_value.to_string())
+    _simulate(0.5 + prompt_tokens / 20000, 0.1)
+    reply = "Thank you. Could you walk me through how you would validate that model before deployment?"
+    total_tokens = prompt_tokens + estimate_tokens(reply)
+    return AIMessage(content=reply, response_metadata={"token_usage": {"total_tokens": total_tokens}})
+
+
+def install_stand_ins():
+    """Point the pipeline modules at the local stand-ins"""
+    import STT
+    import TTS
+    import response
+    from langchain_core.runnables import RunnableLambda
+    from langchain_core.runnables.history import RunnableWithMessageHistory
+
+    STT.Groq = StandInGroq
+    TTS.gTTS = StandInGTTS
+    response.chain_with_history = RunnableWithMessageHistory(
+        response.prompt | RunnableLambda(stand_in_chat),
+        lambda session_id: response.get_memory(session_id),
+        input_messages_key="input",
+        history_messages_key="history"
+    )
+
+
+def lift_quotas():
+    """Stand-in runs measure our code, not provider quotas"""
+    scheduler.limits = {key: {"rpm": 10 ** 9, "tpm": None} for key in DEFAULT_LIMITS}
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size of this process, or None where it can't be read cheaply"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # Peak rather than current RSS; KB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+class LoadRun:
+    def __init__(
+        self,
+        rate: float,
+        duration: float,
+        max_sessions: int,
+        audio_path: str,
+        script: List[str],
+        think_time: float = 0.0,
+        sample_interval: float = 1.0,
+        run_id: int = 0,
+        trace_memory: bool = False
+    ):
+        """
+        One open-loop run at a fixed session arrival rate
+
+        Args:
+            rate: Session arrivals per second (Poisson)
+            duration: Seconds during which new sessions arrive
+            max_sessions: Harness cap on concurrent sessions; arrivals above it are shed
+            audio_path: Fixture audio sent to STT on every turn
+            script: Candidate turns replayed by every session
+            think_time: Mean pause between turns of one session (seconds)
+            sample_interval: Seconds between memory samples
+            run_id: Prefix for session IDs so runs never share chat histories
+            trace_memory: Sample Python heap with tracemalloc instead of RSS.
+                Slows every allocation, so latencies are skewed upwards.
+        """
+        self.rate = rate
+        self.duration = duration
+        self.max_sessions = max_sessions
+        self.audio_path = audio_path
+        self.script = script
+        self.think_time = think_time
+        self.sample_interval = sample_interval
+        self.run_id = run_id
+        self.trace_memory = trace_memory
+
+        # Successful and failed calls are timed separately
+        self.latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.failure_latencies: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.errors: Dict[str, int] = {stage: 0 for stage in STAGES}
+        self.memory_samples: List[tuple] = []
+        self.sessions_started = 0
+        self.sessions_rejected = 0
+        self.active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        self._session_ids = itertools.count()
+
+    def _timed(self, stage: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception:
+            with self._lock:
+                self.errors[stage] += 1
+                self.failure_latencies[stage].append(time.perf_counter() - start)
+            raise
+        with self._lock:
+            self.latencies[stage].append(time.perf_counter() - start)
+        return result
+
+    def _session(self, session_id: str, workdir: str):
+        from STT import transcribe_audio
+        from TTS import text_to_speech_with_gtts
+        from response import chat_with_bot
+
+        tts_path = os.path.join(workdir, f"{session_id}.mp3")
+        try:
+            for turn in self.script:
+                _current_turn.text = turn
+                start = time.perf_counter()
+                try:
+                    text = self._timed("stt", transcribe_audio, self.audio_path)
+                    reply = self._timed("chat", chat_with_bot, text, session_id)
+                    self._timed("tts", text_to_speech_with_gtts, reply, tts_path)
+                except Exception as e:
+                    logging.debug(f"Session {session_id} turn failed: {e}")
+                    with self._lock:
+                        self.errors["turn"] += 1
+                        self.failure_latencies["turn"].append(time.perf_counter() - start)
+                    break
+                with self._lock:
+                    self.latencies["turn"].append(time.perf_counter() - start)
+                if self.think_time:
+                    time.sleep(random.expovariate(1 / self.think_time))
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _memory(self) -> Optional[int]:
+        if self.trace_memory:
+            return tracemalloc.get_traced_memory()[0]
+        return rss_bytes()
+
+    def _sample_memory(self, start: float, stop: threading.Event):
+        while True:
+            current = self._memory()
+            if current is not None:
+                self.memory_samples.append((time.perf_counter() - start, current))
+            if stop.wait(self.sample_interval):
+                break
+
+    def run(self) -> Dict:
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        stop_sampling = threading.Event()
+        sampler = threading.Thread(target=self._sample_memory, args=(start, stop_sampling), daemon=True)
+        sampler.start()
+        workers = []
+
+        with tempfile.TemporaryDirectory() as workdir:
+            # Open loop: arrivals are scheduled up front, independent of completions
+            next_arrival = start
+            while True:
+                next_arrival += random.expovariate(self.rate)
+                if next_arrival - start > self.duration:
+                    break
+                time.sleep(max(0.0, next_arrival - time.perf_counter()))
+                with self._lock:
+                    if self.active >= self.max_sessions:
+                        self.sessions_rejected += 1
+                        continue
+                    self.active += 1
+                    self.peak_active = max(self.peak_active, self.active)
+                    self.sessions_started += 1
+                session_id = f"load-{self.run_id}-{next(self._session_ids)}"
+                worker = threading.Thread(target=self._session, args=(session_id, workdir), daemon=True)
+                worker.start()
+                workers.append(worker)
+
+            for worker in workers:
+                worker.join()
+
+        elapsed = time.perf_counter() - start
+        stop_sampling.set()
+        sampler.join()
+        current = self._memory()
+        if current is not None:
+            self.memory_samples.append((elapsed, current))
+        if self.trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        else:
+            peak = max((sample for _, sample in self.memory_samples), default=None)
+        return self.report(elapsed, current, peak)
+
+    def report(self, elapsed: float, memory_end: Optional[int], memory_peak: Optional[int]) -> Dict:
+        turns = len(self.latencies["turn"])
+        offered_sessions = self.sessions_started + self.sessions_rejected
+        attempted_turns = turns + self.errors["turn"]
+        return {
+            "rate": self.rate,
+            "elapsed": elapsed,
+            "sessions_started": self.sessions_started,
+            "sessions_rejected": self.sessions_rejected,
+            "peak_active": self.peak_active,
+            "turns": turns,
+            "throughput": turns / elapsed if elapsed else 0.0,
+            "offered_turn_rate": self.rate * len(self.script),
+            "error_rate": self.errors["turn"] / attempted_turns if attempted_turns else 0.0,
+            "reject_rate": self.sessions_rejected / offered_sessions if offered_sessions else 0.0,
+            "latency": {
+                stage: {pct: percentile(values, pct) for pct in (50, 90, 99)}
+                for stage, values in self.latencies.items()
+            },
+            "failure_latency": {
+                stage: percentile(values, 50) for stage, values in self.failure_latencies.items()
+            },
+            "errors": dict(self.errors),
+            "memory_kind": "python heap" if self.trace_memory else "rss",
+            "memory_samples": self.memory_samples,
+            "memory_end": memory_end,
+            "memory_peak": memory_peak,
+        }
+
+
+def print_report(result: Dict):
+    print(f"\n=== {result['rate']:.2f} sessions/s for {result['elapsed']:.1f}s")
+    print(f"sessions: {result['sessions_started']} started, peak {result['peak_active']} concurrent")
+    print(
+        f"turns: {result['turns']} ({result['throughput']:.2f}/s, offered {result['offered_turn_rate']:.2f}/s), "
+        f"error rate {result['error_rate']:.1%}"
+    )
+    if result["sessions_rejected"]:
+        print(
+            f"harness cap: {result['sessions_rejected']} arrivals ({result['reject_rate']:.1%}) shed by "
+            f"--max-sessions; the pipeline saw less than the offered load"
+        )
+    print(f"{'stage':<6} {'p50':>8} {'p90':>8} {'p99':>8} {'errors':>7} {'err p50':>8}")
+    for stage in STAGES:
+        pcts = result["latency"][stage]
+        print(
+            f"{stage:<6} {pcts[50]:>7.3f}s {pcts[90]:>7.3f}s {pcts[99]:>7.3f}s "
+            f"{result['errors'][stage]:>7} {result['failure_latency'][stage]:>7.3f}s"
+        )
+    samples = result["memory_samples"]
+    if samples:
+        first, last = samples[0][1], samples[-1][1]
+        print(
+            f"memory ({result['memory_kind']}): {first / 1e6:.1f} MB -> {last / 1e6:.1f} MB "
+            f"over {samples[-1][0]:.0f}s (peak {result['memory_peak'] / 1e6:.1f} MB)"
+        )
+
+
+def is_saturated(result: Dict, baseline_turn: float, max_error_rate: float = 0.01, max_slowdown: float = 2.0) -> bool:
+    """
+    Saturated once turns fail or turn latency inflates
+
+    Arrivals shed by the harness's own --max-sessions cap are not counted;
+    they are reported separately by print_report.
+
+    Args:
+        result: Report of one run
+        baseline_turn: Median turn latency of the lightest run
+        max_error_rate: Tolerated fraction of failed turns
+        max_slowdown: Tolerated p90 turn latency as a multiple of the baseline
+    """
+    return (
+        result["error_rate"] > max_error_rate
+        or result["latency"]["turn"][90] > max_slowdown * baseline_turn
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded interviews against the pipeline under load")
+    parser.add_argument("--rates", default="0.5,1,2,4", help="Comma-separated session arrival rates (per second)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of arrivals per rate")
+    parser.add_argument(
+        "--max-sessions", type=int, default=1000,
+        help="Harness cap on concurrent sessions (keep it above rate x session length)"
+    )
+    parser.add_argument("--audio", default="my_audio.wav", help="Fixture audio sent on every turn")
+    parser.add_argument("--script", help="Text file with one candidate turn per line")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean pause between turns (seconds)")
+    parser.add_argument("--live", action="store_true", help="Call the real providers instead of stand-ins")
+    parser.add_argument(
+        "--enforce-quotas", action="store_true",
+        help="Keep provider quotas in the scheduler (stand-in runs lift them by default)"
+    )
+    parser.add_argument(
+        "--trace-memory", action="store_true",
+        help="Track Python heap with tracemalloc instead of RSS (slower, skews latencies)"
+    )
+    args = parser.parse_args()
+
+    script = DEFAULT_SCRIPT
+    if args.script:
+        with open(args.script, "r") as f:
+            script = [line.strip() for line in f if line.strip()]
+
+    if not args.live:
+        install_stand_ins()
+        if not args.enforce_quotas:
+            lift_quotas()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    import response
+
+    results = []
+    for run_id, rate in enumerate(float(value) for value in args.rates.split(",")):
+        # Every run starts from empty chat histories and fresh quota state
+        response.store.clear()
+        scheduler.reset()
+        result = LoadRun(
+            rate, args.duration, args.max_sessions, args.audio, script, args.think_time,
+            run_id=run_id, trace_memory=args.trace_memory
+        ).run()
+        print_report(result)
+        results.append(result)
+
+    baseline_turn = min(results, key=lambda result: result["rate"])["latency"]["turn"][50]
+    saturated = next(
+        (result for result in sorted(results, key=lambda result: result["rate"])
+         if is_saturated(result, baseline_turn)),
+        None
+    )
+    if saturated:
+        print(f"\nSaturation reached at {saturated['rate']:.2f} sessions/s")
+    else:
+        print("\nNo saturation within the tested rates")
+    capped = [result["rate"] for result in results if result["sessions_rejected"]]
+    if capped:
+        rates = ", ".join(f"{rate:.2f}" for rate in capped)
+        print(f"Runs at {rates} sessions/s hit --max-sessions; raise it to measure the pipeline there")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,12 @@
 import json
+import time
 import uuid
-from datetime import datetime
 from typing import List, Dict, Optional
 from langchain_groq import ChatGroq  # Or any other LLM client
 import os
+from rate_limiter import scheduler, estimate_tokens, quota_http_client, COMPLETION_TOKEN_BUDGET, PRIORITY_LIVE
+from transcript_index import TranscriptIndex
+from chat_messages import Message, HistoryView, write_sessions, deserialize_sessions
 
 DEFAULT_INTERVIEW_PROMPT = """You are a professional AI Interview Bot designed to conduct technical interviews.
 
@@ -36,17 +39,21 @@ class ChatManager:
             storage_path: Optional path for persistent history (JSON file)
         """
         # Initialize LLM (Groq example)
+        self.model_name = "Qwen-2.5-32b"
         self.llm = ChatGroq(
             groq_api_key=os.getenv("GROQ_API_KEY"),
-            model_name="Qwen-2.5-32b",
-            temperature=0.7
+            model_name=self.model_name,
+            temperature=0.7,
+            max_retries=0,  # retries go through the shared scheduler
+            http_client=quota_http_client("groq", self.model_name)
         )
         
         # Chat history setup
         self.storage_path = storage_path
-        self.sessions: Dict[str, List[Dict]] = {}
+        self.sessions: Dict[str, List[Message]] = {}
         self.current_session_id = self._generate_session_id()
         self.system_prompts: Dict[str, str] = {}
+        self.index = TranscriptIndex()
         
         self._load_history()
 
@@ -61,15 +68,19 @@ class ChatManager:
             
         try:
             with open(self.storage_path, 'r') as f:
-                self.sessions = json.load(f)
+                self.sessions = deserialize_sessions(json.load(f))
         except (FileNotFoundError, json.JSONDecodeError):
             self.sessions = {}
 
+        self.index.clear()
+        for session_id, messages in self.sessions.items():
+            self.index.add_session(session_id, (msg.content for msg in messages))
+
     def _save_history(self):
         """Save chat history to file"""
         if self.storage_path:
             with open(self.storage_path, 'w') as f:
-                json.dump(self.sessions, f, indent=2)
+                write_sessions(f, self.sessions)
 
     def start_new_session(self) -> str:
         """Start fresh conversation, returns new session ID"""
@@ -96,15 +107,9 @@ class ChatManager:
         if session_id not in self.sessions:
             self.sessions[session_id] = []
             
-        message = {
-            'role': role,
-            'content': content,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        if metadata:
-            message.update(metadata)
+        message = Message.now(role, content, metadata)
             
+        self.index.add_message(session_id, content, len(self.sessions[session_id]))
         self.sessions[session_id].append(message)
         self._save_history()
 
@@ -116,14 +121,43 @@ class ChatManager:
         """
         Get conversation history
         
+        Args:
+            session_id: Conversation ID (defaults to current)
+            max_messages: Limit number of messages
+            
+        Returns:
+            New list of message dicts; editing it does not change the stored history
+        """
+        return self.history_view(session_id, max_messages).to_list()
+
+    def history_view(
+        self,
+        session_id: Optional[str] = None,
+        max_messages: Optional[int] = None
+    ) -> HistoryView:
+        """
+        Lazy read-only variant of get_history; messages are converted on access
+        
         Args:
             session_id: Conversation ID (defaults to current)
             max_messages: Limit number of messages
         """
         session_id = session_id or self.current_session_id
-        history = self.sessions.get(session_id, [])
+        history = HistoryView(self.sessions.get(session_id, []))
         return history[-max_messages:] if max_messages else history
 
+    def search_transcripts(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Search past interviews by keywords and "quoted phrases"
+        
+        Args:
+            query: All terms/phrases must appear in the interview
+            limit: Maximum number of sessions returned
+            
+        Returns:
+            List of {'session_id', 'score', 'message_indices'} ranked by BM25
+        """
+        return self.index.search(query, limit)
 
     
 
@@ -132,7 +166,8 @@ class ChatManager:
         self,
         user_input: str,
         session_id: Optional[str] = None,
-        use_system_prompt: bool = True
+        use_system_prompt: bool = True,
+        priority: int = PRIORITY_LIVE
     ) -> str:
         """
         Get LLM response with managed interview context
@@ -141,6 +176,7 @@ class ChatManager:
             user_input: Candidate's message
             session_id: Interview session ID (defaults to current)
             use_system_prompt: Whether to include interview instructions
+            priority: Scheduler priority (PRIORITY_LIVE or PRIORITY_BATCH)
             
         Returns:
             str: Generated response following interview protocol
@@ -149,7 +185,7 @@ class ChatManager:
         
         # 1. Retrieve session-specific prompt and history
         system_prompt = self.system_prompts.get(session_id, DEFAULT_INTERVIEW_PROMPT)
-        history = self.get_history(session_id)
+        history = self.history_view(session_id)
         
         # 2. Prepare message chain
         messages = []
@@ -172,7 +208,22 @@ class ChatManager:
         
         # 3. Generate and store response
         try:
-            response = self.llm.invoke(messages).content
+            estimated = estimate_tokens(
+                "".join(msg["content"] for msg in messages)
+            ) + COMPLETION_TOKEN_BUDGET
+            started = time.monotonic()
+            result = scheduler.run(
+                "groq", self.model_name,
+                lambda: self.llm.invoke(messages),
+                tokens=estimated,
+                priority=priority
+            )
+            usage = result.response_metadata.get("token_usage", {})
+            if usage.get("total_tokens"):
+                scheduler.record_usage(
+                    "groq", self.model_name, estimated, usage["total_tokens"], since=started
+                )
+            response = result.content
             self.add_message("user", user_input, session_id)
             self.add_message("assistant", response, session_id)
             self._save_history()
@@ -186,8 +237,10 @@ class ChatManager:
         """Clear specific or all conversation history"""
         if session_id:
             self.sessions.pop(session_id, None)
+            self.index.remove_session(session_id)
         else:
             self.sessions.clear()
+            self.index.clear()
         self._save_history()
 
 
@@ -0,0 +1,339 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Lower value is served first
+PRIORITY_LIVE = 0
+PRIORITY_BATCH = 10
+
+# Requests/tokens per minute for each (provider, model). Values follow the
+# Groq free tier; quota headers on responses tighten them at runtime.
+DEFAULT_LIMITS: Dict[Tuple[str, str], Dict[str, Optional[int]]] = {
+    ("groq", "distil-whisper-large-v3-en"): {"rpm": 20, "tpm": None},
+    ("groq", "llama-3.1-8b-instant"): {"rpm": 30, "tpm": 6000},
+    ("groq", "Qwen-2.5-32b"): {"rpm": 30, "tpm": 6000},
+    ("gtts", "en"): {"rpm": 60, "tpm": None},
+}
+FALLBACK_LIMITS = {"rpm": 30, "tpm": None}
+
+# Tokens reserved for the reply when estimating a chat call up front
+COMPLETION_TOKEN_BUDGET = 512
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for quota accounting (about 4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse quota reset values such as '2.5', '7.66s', '1m26.4s' or '120ms' into seconds"""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    seconds = 0.0
+    number = ""
+    i = 0
+    while i < len(value):
+        char = value[i]
+        if char.isdigit() or char == ".":
+            number += char
+        elif value.startswith("ms", i) and number:
+            seconds += float(number) / 1000
+            number = ""
+            i += 1
+        elif char in "hms" and number:
+            seconds += float(number) * {"h": 3600, "m": 60, "s": 1}[char]
+            number = ""
+        else:
+            return None
+        i += 1
+    return seconds if not number else None
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int):
+        """
+        Bucket refilled continuously up to a per-minute capacity
+
+        Args:
+            per_minute: Units allowed per minute (also the burst size)
+        """
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)"""
+        self._refill(now)
+        # Requests larger than the bucket wait for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= amount
+
+    def set_capacity(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = min(self.tokens, self.capacity)
+
+    def clamp(self, remaining: float):
+        """Never believe we have more than the provider says is left"""
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class _Lane:
+    """Quota state and waiting callers for one (provider, model)"""
+
+    def __init__(self, rpm: int, tpm: Optional[int]):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.blocked_until = 0.0
+        # When the token bucket was last set from x-ratelimit-remaining-tokens
+        self.tokens_synced_at = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+
+    def wait_time(self, requests: int, tokens: int, now: float) -> float:
+        wait = max(0.0, self.blocked_until - now)
+        wait = max(wait, self.requests.wait_time(requests, now))
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def consume(self, requests: int, tokens: int):
+        self.requests.consume(min(requests, self.requests.capacity))
+        if self.tokens is not None and tokens:
+            self.tokens.consume(min(tokens, self.tokens.capacity))
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """True for HTTP 429 errors raised by the Groq SDK, gTTS or similar clients"""
+    for attr in ("status_code", "status"):
+        if getattr(exc, attr, None) == 429:
+            return True
+    for attr in ("response", "rsp"):
+        response = getattr(exc, attr, None)
+        if response is not None and getattr(response, "status_code", None) == 429:
+            return True
+    return False
+
+
+def _error_headers(exc: Exception):
+    for attr in ("response", "rsp"):
+        response = getattr(exc, attr, None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            return headers
+    return {}
+
+
+class RateLimitScheduler:
+    def __init__(self, limits: Optional[Dict[Tuple[str, str], Dict[str, Optional[int]]]] = None):
+        """
+        Shared request/token-per-minute scheduler for provider calls
+
+        Callers for the same (provider, model) queue in priority order and are
+        released only when both the request and token buckets allow it.
+
+        Args:
+            limits: Mapping of (provider, model) to {"rpm": int, "tpm": int or None}
+        """
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self._lanes: Dict[Tuple[str, str], _Lane] = {}
+        self._cond = threading.Condition()
+        self._counter = itertools.count()
+
+    def reset(self):
+        """Forget all quota state; lanes are rebuilt from `limits` on next use"""
+        with self._cond:
+            self._lanes.clear()
+            self._cond.notify_all()
+
+    def _lane(self, provider: str, model: str) -> _Lane:
+        key = (provider, model)
+        lane = self._lanes.get(key)
+        if lane is None:
+            limit = self.limits.get(key, FALLBACK_LIMITS)
+            lane = self._lanes[key] = _Lane(limit["rpm"], limit.get("tpm"))
+        return lane
+
+    def acquire(
+        self,
+        provider: str,
+        model: str,
+        tokens: int = 0,
+        priority: int = PRIORITY_LIVE,
+        timeout: Optional[float] = None,
+        requests: int = 1
+    ):
+        """
+        Block until a call to the provider may be made, then reserve its quota
+
+        Args:
+            provider: Provider name, e.g. 'groq'
+            model: Model name used for the call
+            tokens: Estimated tokens the call will use (prompt + completion)
+            priority: PRIORITY_LIVE for interview turns, PRIORITY_BATCH for background work
+            timeout: Maximum seconds to wait before raising TimeoutError
+            requests: HTTP requests the call makes (e.g. one per gTTS text chunk)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            lane = self._lane(provider, model)
+            ticket = (priority, next(self._counter))
+            heapq.heappush(lane.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if lane.waiters[0] == ticket:
+                        wait = lane.wait_time(requests, tokens, now)
+                        if wait <= 0:
+                            lane.consume(requests, tokens)
+                            heapq.heappop(lane.waiters)
+                            self._cond.notify_all()
+                            return
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise TimeoutError(f"Rate limit wait exceeded for {provider}/{model}")
+                        wait = remaining if wait is None else min(wait, remaining)
+                    self._cond.wait(wait)
+            except BaseException:
+                if ticket in lane.waiters:
+                    lane.waiters.remove(ticket)
+                    heapq.heapify(lane.waiters)
+                    self._cond.notify_all()
+                raise
+
+    def record_usage(
+        self,
+        provider: str,
+        model: str,
+        estimated: int,
+        actual: int,
+        since: Optional[float] = None
+    ):
+        """
+        Correct the token bucket once the real usage of a call is known
+
+        Args:
+            provider: Provider name, e.g. 'groq'
+            model: Model name used for the call
+            estimated: Tokens reserved when the call was acquired
+            actual: Tokens the provider reports the call used
+            since: time.monotonic() taken before the call; if quota headers
+                synced the bucket after that, they already include this call
+                and no correction is applied
+        """
+        with self._cond:
+            lane = self._lane(provider, model)
+            if since is not None and lane.tokens_synced_at >= since:
+                return
+            if lane.tokens is not None:
+                lane.tokens.consume(actual - estimated)
+                self._cond.notify_all()
+
+    def update_from_headers(self, provider: str, model: str, headers):
+        """
+        Adapt to quota headers returned by the provider
+
+        Understands x-ratelimit-{limit,remaining,reset}-{requests,tokens} and
+        retry-after. Groq reports daily request limits, so requests headers only
+        ever tighten the per-minute bucket.
+        """
+        if not headers:
+            return
+        get = headers.get
+        with self._cond:
+            lane = self._lane(provider, model)
+            now = time.monotonic()
+
+            limit_tokens = get("x-ratelimit-limit-tokens")
+            if limit_tokens and limit_tokens.isdigit():
+                if lane.tokens is None:
+                    lane.tokens = TokenBucket(int(limit_tokens))
+                else:
+                    lane.tokens.set_capacity(int(limit_tokens))
+            remaining_tokens = get("x-ratelimit-remaining-tokens")
+            if lane.tokens is not None and remaining_tokens and remaining_tokens.isdigit():
+                lane.tokens.clamp(int(remaining_tokens))
+                lane.tokens_synced_at = now
+
+            remaining_requests = get("x-ratelimit-remaining-requests")
+            if remaining_requests and remaining_requests.isdigit():
+                lane.requests.clamp(int(remaining_requests))
+                if int(remaining_requests) == 0:
+                    reset = _parse_duration(get("x-ratelimit-reset-requests") or "")
+                    if reset:
+                        lane.blocked_until = max(lane.blocked_until, now + reset)
+
+            retry_after = _parse_duration(get("retry-after") or "")
+            if retry_after:
+                lane.blocked_until = max(lane.blocked_until, now + retry_after)
+            self._cond.notify_all()
+
+    def backoff(self, provider: str, model: str, seconds: float):
+        """Hold every caller of this provider/model for `seconds`"""
+        with self._cond:
+            lane = self._lane(provider, model)
+            lane.blocked_until = max(lane.blocked_until, time.monotonic() + seconds)
+            lane.requests.clamp(0)
+            self._cond.notify_all()
+
+    def run(
+        self,
+        provider: str,
+        model: str,
+        fn: Callable,
+        tokens: int = 0,
+        priority: int = PRIORITY_LIVE,
+        max_attempts: int = 3,
+        timeout: Optional[float] = None,
+        requests: int = 1
+    ):
+        """
+        Call `fn()` under the scheduler, retrying on HTTP 429
+
+        Retries re-enter the queue instead of hammering the provider; a 429
+        pauses the whole lane for the advertised retry-after (or a backoff).
+        """
+        for attempt in range(1, max_attempts + 1):
+            self.acquire(provider, model, tokens, priority, timeout, requests)
+            try:
+                return fn()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == max_attempts:
+                    raise
+                headers = _error_headers(e)
+                self.update_from_headers(provider, model, headers)
+                if not headers.get("retry-after"):
+                    self.backoff(provider, model, 2.0 ** attempt)
+                logging.warning(f"Rate limited by {provider}/{model}, retry {attempt}/{max_attempts - 1}")
+
+
+# Shared by STT, chat and TTS so all provider traffic sees one quota view
+scheduler = RateLimitScheduler()
+
+
+def quota_http_client(provider: str, model: str):
+    """httpx client that feeds the quota headers of every response to the scheduler"""
+    import httpx
+
+    def _on_response(response):
+        scheduler.update_from_headers(provider, model, response.headers)
+
+    return httpx.Client(event_hooks={"response": [_on_response]})
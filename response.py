@@ -7,6 +7,7 @@ from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.chat_history import InMemoryChatMessageHistory
 from typing import Dict
 import os
+import time
 from dotenv import load_dotenv
 load_dotenv()
 
@@ -22,13 +23,17 @@ HF_TOKEN=os.getenv("HUGGING_FACE")
 # )
 
 from langchain_groq import ChatGroq
+from rate_limiter import scheduler, estimate_tokens, quota_http_client, COMPLETION_TOKEN_BUDGET, PRIORITY_LIVE
+
+CHAT_MODEL = "llama-3.1-8b-instant"
 
 llm = ChatGroq(
-    model="llama-3.1-8b-instant",
+    model=CHAT_MODEL,
     temperature=0,
     max_tokens=None,
     timeout=None,
-    max_retries=2,
+    max_retries=0,  # retries go through the shared scheduler
+    http_client=quota_http_client("groq", CHAT_MODEL),
     # other params...
 )
 
@@ -121,8 +126,22 @@ chain_with_history = RunnableWithMessageHistory(
 )
 
 
-def chat_with_bot(user_input: str, session_id="default") -> str:
-    response = chain_with_history.invoke({"input": user_input}, config={"configurable": {"session_id": session_id}})
+def chat_with_bot(user_input: str, session_id="default", priority=PRIORITY_LIVE) -> str:
+    history = get_memory(session_id).messages
+    estimated = estimate_tokens(
+        system_prompt.content + user_input + "".join(str(msg.content) for msg in history)
+    ) + COMPLETION_TOKEN_BUDGET
+
+    started = time.monotonic()
+    response = scheduler.run(
+        "groq", CHAT_MODEL,
+        lambda: chain_with_history.invoke({"input": user_input}, config={"configurable": {"session_id": session_id}}),
+        tokens=estimated,
+        priority=priority
+    )
+    usage = response.response_metadata.get("token_usage", {})
+    if usage.get("total_tokens"):
+        scheduler.record_usage("groq", CHAT_MODEL, estimated, usage["total_tokens"], since=started)
     return response.content
 
 # print(chat_with_bot("what is Machine learning"))
@@ -0,0 +1,69 @@
+import io
+import json
+import sys
+from datetime import datetime
+
+from chat_messages import (
+    HistoryView, Message, deserialize_sessions, write_sessions
+)
+
+
+def test_naive_iso_timestamp_round_trips():
+    record = {"role": "user", "content": "hi", "timestamp": "2025-04-06T10:03:38.123456", "score": 7}
+    message = Message.from_dict(record)
+    assert isinstance(message.timestamp, float)
+    assert message.metadata == {"score": 7}
+    assert message.to_dict() == record
+
+
+def test_missing_timestamp_stays_missing():
+    record = {"role": "assistant", "content": "hello"}
+    message = Message.from_dict(record)
+    assert message.timestamp is None
+    assert message.to_dict() == record
+
+
+def test_aware_and_unparseable_timestamps_are_kept_verbatim():
+    for value in ("2025-04-06T10:03:38+05:30", "yesterday", "2025-04-06T10:03:38.120", 1712400000):
+        record = {"role": "user", "content": "x", "timestamp": value, "extra": 1}
+        message = Message.from_dict(record)
+        assert message.timestamp is None
+        dumped = message.to_dict()
+        assert dumped == record
+        assert list(dumped) == list(record)
+
+
+def test_constructor_without_timestamp_builds_untimestamped_message():
+    message = Message("user", "hi")
+    assert message.timestamp is None
+    assert message.to_dict() == {"role": "user", "content": "hi"}
+
+
+def test_new_messages_get_current_timestamp_and_interned_role():
+    message = Message.now("".join(["us", "er"]), "hi")
+    assert message.role is sys.intern("user")
+    assert abs(message.timestamp - datetime.now().timestamp()) < 5
+    assert message.metadata is None
+
+
+def test_history_view_behaves_like_list_of_dicts():
+    messages = [Message("user", "a", 0.0), Message("assistant", "b", 1.0, {"k": 1})]
+    view = HistoryView(messages)
+    assert len(view) == 2
+    assert view[-1]["k"] == 1
+    assert [msg["content"] for msg in view[-1:]] == ["b"]
+    assert view == [msg.to_dict() for msg in messages]
+    assert isinstance(view.to_list(), list)
+
+
+def test_written_sessions_match_json_dump():
+    data = {
+        "s1": [{"role": "user", "content": "line\nbreak \"quoted\" é", "timestamp": "2025-04-06T10:03:38"}],
+        "s2": [],
+        "s\"3": [{"role": "assistant", "content": "ok", "meta": {"nested": [1, 2]}}],
+    }
+    sessions = deserialize_sessions(data)
+    for value in (data, {}):
+        f = io.StringIO()
+        write_sessions(f, deserialize_sessions(value))
+        assert f.getvalue() == json.dumps(value, indent=2)
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+# The pipeline modules need their provider SDKs importable even with stand-ins
+for module in ("speech_recognition", "pydub", "groq", "langchain_groq", "langchain", "gtts", "dotenv"):
+    pytest.importorskip(module)
+
+import load_generator
+from rate_limiter import scheduler
+
+
+@pytest.fixture
+def stand_ins(monkeypatch):
+    import STT
+    import TTS
+    import response
+
+    # Re-set current values so monkeypatch restores them after install_stand_ins()
+    for module, name in [(STT, "Groq"), (TTS, "gTTS"), (response, "chain_with_history")]:
+        monkeypatch.setattr(module, name, getattr(module, name))
+    monkeypatch.setattr(scheduler, "limits", dict(scheduler.limits))
+    monkeypatch.setattr(load_generator, "_simulate", lambda base, jitter: None)
+
+    load_generator.install_stand_ins()
+    load_generator.lift_quotas()
+    scheduler.reset()
+    yield
+    response.store.clear()
+    scheduler.reset()
+
+
+def test_stand_in_run_completes_turns_without_errors(stand_ins):
+    random.seed(0)
+    run = load_generator.LoadRun(
+        rate=5, duration=1, max_sessions=100, audio_path="my_audio.wav",
+        script=load_generator.DEFAULT_SCRIPT[:2], sample_interval=0.2
+    )
+    result = run.run()
+
+    assert result["errors"]["turn"] == 0
+    assert result["turns"] > 0
+    assert result["sessions_rejected"] == 0
+    assert result["memory_samples"]
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+
+from rate_limiter import RateLimitScheduler, PRIORITY_BATCH, PRIORITY_LIVE
+
+LANE = ("groq", "test-model")
+
+
+def make_scheduler(rpm=6000, tpm=None):
+    return RateLimitScheduler({LANE: {"rpm": rpm, "tpm": tpm}})
+
+
+def lane_of(scheduler):
+    return scheduler._lane(*LANE)
+
+
+def wait_for_waiters(scheduler, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while len(lane_of(scheduler).waiters) < count:
+        assert time.monotonic() < deadline, "waiters never queued"
+        time.sleep(0.005)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, headers):
+        super().__init__("429")
+        self.response = type("Response", (), {"headers": headers})()
+
+
+def test_live_callers_are_released_before_batch():
+    scheduler = make_scheduler()
+    # Hold the lane so every caller is queued before the first release
+    scheduler.backoff(*LANE, 0.2)
+    order = []
+
+    def call(name, priority):
+        scheduler.acquire(*LANE, priority=priority)
+        order.append(name)
+
+    threads = []
+    for name, priority in [("b0", PRIORITY_BATCH), ("l0", PRIORITY_LIVE), ("b1", PRIORITY_BATCH), ("l1", PRIORITY_LIVE)]:
+        thread = threading.Thread(target=call, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        wait_for_waiters(scheduler, len(threads))
+    for thread in threads:
+        thread.join(5)
+
+    assert order == ["l0", "l1", "b0", "b1"]
+
+
+def test_timeout_removes_waiter_and_unblocks_queue():
+    scheduler = make_scheduler(rpm=60)
+    for _ in range(60):
+        scheduler.acquire(*LANE)
+
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(*LANE, timeout=0.05)
+    assert lane_of(scheduler).waiters == []
+
+    # A fresh request is only limited by the bucket, not by a stale ticket
+    lane_of(scheduler).requests.tokens = 1
+    scheduler.acquire(*LANE, timeout=0.5)
+
+
+def test_requests_larger_than_one_consume_multiple_units():
+    scheduler = make_scheduler(rpm=10)
+    scheduler.acquire(*LANE, requests=4)
+    assert lane_of(scheduler).requests.tokens == pytest.approx(6, abs=0.01)
+
+
+def test_headers_clamp_buckets_and_retry_after_blocks_lane():
+    scheduler = make_scheduler(rpm=30, tpm=6000)
+    scheduler.update_from_headers(*LANE, {
+        "x-ratelimit-limit-tokens": "5000",
+        "x-ratelimit-remaining-tokens": "120",
+        "x-ratelimit-remaining-requests": "3",
+        "retry-after": "1.5",
+    })
+    lane = lane_of(scheduler)
+
+    assert lane.tokens.capacity == 5000
+    assert lane.tokens.tokens == pytest.approx(120, abs=1)
+    assert lane.requests.tokens == pytest.approx(3, abs=0.1)
+    assert lane.blocked_until - time.monotonic() == pytest.approx(1.5, abs=0.1)
+    with pytest.raises(TimeoutError):
+        scheduler.acquire(*LANE, timeout=0.05)
+
+
+def test_exhausted_requests_block_until_reset():
+    scheduler = make_scheduler()
+    scheduler.update_from_headers(*LANE, {
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "1m0s",
+    })
+    assert lane_of(scheduler).blocked_until - time.monotonic() == pytest.approx(60, abs=1)
+
+
+def test_run_retries_after_429_using_retry_after():
+    scheduler = make_scheduler()
+    calls = []
+
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            raise RateLimited({"retry-after": "0.1"})
+        return "ok"
+
+    assert scheduler.run(*LANE, flaky) == "ok"
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.09
+
+
+def test_run_backs_off_without_retry_after_and_gives_up(monkeypatch):
+    scheduler = make_scheduler()
+    backoffs = []
+    monkeypatch.setattr(scheduler, "backoff", lambda provider, model, seconds: backoffs.append(seconds))
+
+    def always_limited():
+        raise RateLimited({})
+
+    with pytest.raises(RateLimited):
+        scheduler.run(*LANE, always_limited, max_attempts=3)
+    assert backoffs == [2.0, 4.0]
+
+
+def test_run_does_not_retry_other_errors():
+    scheduler = make_scheduler()
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        scheduler.run(*LANE, broken)
+    assert calls == [1]
+
+
+def test_record_usage_corrects_estimate_without_headers():
+    scheduler = make_scheduler(tpm=6000)
+    started = time.monotonic()
+    scheduler.acquire(*LANE, tokens=1000)
+    scheduler.record_usage(*LANE, estimated=1000, actual=400, since=started)
+    assert lane_of(scheduler).tokens.tokens == pytest.approx(5600, abs=5)
+
+
+def test_record_usage_skipped_after_header_sync():
+    scheduler = make_scheduler(tpm=6000)
+    started = time.monotonic()
+    scheduler.acquire(*LANE, tokens=1000)
+    # The response hook reports what the provider says is left, this call included
+    scheduler.update_from_headers(*LANE, {"x-ratelimit-remaining-tokens": "4500"})
+    scheduler.record_usage(*LANE, estimated=1000, actual=400, since=started)
+    assert lane_of(scheduler).tokens.tokens == pytest.approx(4500, abs=5)
@@ -0,0 +1,137 @@
+from transcript_index import TranscriptIndex, parse_query, tokenize
+
+
+def build_index():
+    index = TranscriptIndex()
+    index.add_session("a", [
+        "Tell me about a PyTorch project.",
+        "I fine-tuned a model in PyTorch and saw overfitting, so I added dropout.",
+    ])
+    index.add_session("b", [
+        "How do you handle overfitting?",
+        "Mostly with scikit-learn regularization and gradient descent tuning.",
+    ])
+    index.add_session("c", [
+        "Describe gradient boosting.",
+        "It follows the gradient, and plain descent is not really involved.",
+    ])
+    return index
+
+
+def session_ids(results):
+    return [result["session_id"] for result in results]
+
+
+def test_tokenize_splits_hyphens_and_keeps_tech_terms():
+    assert tokenize("Scikit-learn, C++ and node.js") == ["scikit", "learn", "c++", "and", "node.js"]
+
+
+def test_tokenize_is_unicode_aware():
+    assert tokenize("Naïve RÉSUMÉ café Straße") == ["naïve", "résumé", "café", "strasse"]
+    assert parse_query("résumé") == [["résumé"]]
+
+
+def test_unicode_terms_are_searchable():
+    index = build_index()
+    index.add_session("f", ["Please send your résumé before the call."])
+    index.add_session("g", ["R and sum are unrelated words."])
+    assert session_ids(index.search("Résumé")) == ["f"]
+
+
+def test_parse_query_builds_phrase_clauses():
+    assert parse_query('"Gradient Descent" scikit-learn pytorch') == [
+        ["gradient", "descent"], ["scikit", "learn"], ["pytorch"]
+    ]
+
+
+def test_all_terms_are_required():
+    index = build_index()
+    assert session_ids(index.search("pytorch overfitting")) == ["a"]
+    assert sorted(session_ids(index.search("overfitting"))) == ["a", "b"]
+    assert index.search("pytorch boosting") == []
+    assert index.search("tensorflow") == []
+
+
+def test_phrase_requires_adjacent_terms_in_one_message():
+    index = build_index()
+    # "c" has both words in one message, but not next to each other
+    assert session_ids(index.search('"gradient descent"')) == ["b"]
+    assert index.search('"descent gradient"') == []
+
+    index.add_session("d", ["The answer ended with gradient", "descent came next"])
+    assert "d" not in session_ids(index.search('"gradient descent"'))
+
+
+def test_hyphenated_words_match_parts_and_phrases():
+    index = build_index()
+    assert session_ids(index.search("scikit")) == ["b"]
+    assert session_ids(index.search("learn")) == ["b"]
+    assert session_ids(index.search("scikit-learn")) == ["b"]
+    index.add_session("e", ["We did some fine tuning of BERT."])
+    assert sorted(session_ids(index.search('"fine tuning"'))) == ["e"]
+    assert session_ids(index.search("fine-tuned")) == ["a"]
+
+
+def test_message_indices_point_at_matching_messages():
+    index = build_index()
+    [result] = index.search("pytorch overfitting")
+    assert result["message_indices"] == [0, 1]
+    [result] = index.search('"gradient descent"')
+    assert result["message_indices"] == [1]
+
+
+def test_bm25_ranks_higher_term_frequency_first():
+    index = TranscriptIndex()
+    index.add_session("once", ["We used pytorch for the project and more words here"])
+    index.add_session("often", ["pytorch pytorch pytorch everywhere in this project"])
+    index.add_session("other", ["tensorflow only"])
+    results = index.search("pytorch")
+    assert session_ids(results) == ["often", "once"]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_phrase_does_not_span_messages_or_misaligned_bytes():
+    index = TranscriptIndex()
+    index.add_session("s", ["alpha beta", "gamma"])
+    assert index.search('"beta gamma"') == []
+    assert session_ids(index.search('"alpha beta"')) == ["s"]
+
+
+def test_sessions_added_out_of_order_keep_postings_sorted():
+    index = TranscriptIndex()
+    index.add_message("old", "pytorch basics")
+    index.add_message("new", "pytorch advanced")
+    index.add_message("old", "more pytorch and overfitting")
+    assert session_ids(index.search("pytorch overfitting")) == ["old"]
+    assert index.search("pytorch overfitting")[0]["message_indices"] == [0, 1]
+    index.remove_session("old")
+    assert session_ids(index.search("pytorch")) == ["new"]
+
+
+def test_limit_returns_best_results_only():
+    index = TranscriptIndex()
+    for i in range(1, 30):
+        index.add_session(f"s{i}", ["pytorch " * i + "filler " * (30 - i)])
+    results = index.search("pytorch", limit=3)
+    assert session_ids(results) == ["s29", "s28", "s27"]
+
+
+def test_remove_session_keeps_index_consistent():
+    index = build_index()
+    index.remove_session("a")
+
+    assert len(index) == 2
+    assert index.search("pytorch") == []
+    assert index.document_frequency("pytorch") == 0
+    assert index.document_frequency("overfitting") == 1
+    assert session_ids(index.search("overfitting")) == ["b"]
+    assert index.total_length == sum(len(tokenize(text)) for text in [
+        "How do you handle overfitting?",
+        "Mostly with scikit-learn regularization and gradient descent tuning.",
+        "Describe gradient boosting.",
+        "It follows the gradient, and plain descent is not really involved.",
+    ])
+
+    # Re-adding after removal starts from message 0 again
+    index.add_message("a", "Back to PyTorch")
+    assert index.search("pytorch")[0]["message_indices"] == [0]
@@ -0,0 +1,289 @@
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional
+
+# Keeps tech terms like "c++" or "node.js" as single tokens. Hyphenated words
+# ("scikit-learn") are split and matched as phrases, see parse_query.
+TOKEN_PATTERN = re.compile(r"\w+(?:[.+#]\w+)*[+#]*")
+QUERY_WORD_SPLIT = re.compile(r"[^\w.+#-]+")
+QUERY_PATTERN = re.compile(r'"([^"]+)"|(\S+)')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Below this candidates-to-postings ratio, probe postings by binary search
+# instead of scanning them
+PROBE_RATIO = 16
+
+# Session token streams are bytearrays of native unsigned ints ("I"), so
+# phrases can be found with bytearray.find and read back without copying
+TERM_ID_WIDTH = array("I").itemsize
+
+
+def tokenize(text: str) -> List[str]:
+    """Casefold text and split it into index terms"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def parse_query(query: str) -> List[List[str]]:
+    """
+    Split a query into required clauses
+
+    Each clause is a list of terms; quoted text and hyphenated words become
+    phrase clauses ('"gradient descent" scikit-learn pytorch' ->
+    [['gradient', 'descent'], ['scikit', 'learn'], ['pytorch']]).
+    """
+    clauses = []
+    for phrase, word in QUERY_PATTERN.findall(query):
+        if phrase:
+            terms = tokenize(phrase)
+            if terms:
+                clauses.append(terms)
+            continue
+        for part in QUERY_WORD_SPLIT.split(word.casefold()):
+            terms = tokenize(part)
+            if terms:
+                clauses.append(terms)
+    return clauses
+
+
+class TranscriptIndex:
+    def __init__(self):
+        """
+        Incremental inverted index over interview transcripts
+
+        Each session is one document with an integer doc id. Per term, postings
+        are two parallel arrays: sorted doc ids and term frequencies. Positions
+        are not stored per term; each session keeps its token stream as packed
+        term ids plus the offset where each message starts, and phrases and
+        matching messages are found by scanning that stream for the candidates
+        that survive the term intersection.
+        """
+        self._term_ids: Dict[str, int] = {}
+        self._postings: List[array] = []
+        self._frequencies: List[array] = []
+
+        self._doc_ids: Dict[str, int] = {}
+        self._session_ids: List[Optional[str]] = []
+        self._streams: List[Optional[bytearray]] = []
+        self._message_starts: List[Optional[array]] = []
+        self._message_indices: List[Optional[array]] = []
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_ids)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._postings)
+            self._postings.append(array("I"))
+            self._frequencies.append(array("I"))
+        return term_id
+
+    def _doc_id(self, session_id: str) -> int:
+        doc_id = self._doc_ids.get(session_id)
+        if doc_id is None:
+            doc_id = self._doc_ids[session_id] = len(self._session_ids)
+            self._session_ids.append(session_id)
+            self._streams.append(bytearray())
+            self._message_starts.append(array("I"))
+            self._message_indices.append(array("I"))
+        return doc_id
+
+    def document_frequency(self, term: str) -> int:
+        """Number of sessions containing `term` (after tokenization)"""
+        term_id = self._term_ids.get(term.casefold())
+        return 0 if term_id is None else len(self._postings[term_id])
+
+    def add_message(self, session_id: str, content: str, message_index: Optional[int] = None):
+        """
+        Index one message of a session
+
+        Args:
+            session_id: Interview session ID
+            content: Message text
+            message_index: Position of the message in the session (defaults to next)
+        """
+        doc_id = self._doc_id(session_id)
+        stream = self._streams[doc_id]
+        indices = self._message_indices[doc_id]
+        if message_index is None:
+            message_index = indices[-1] + 1 if indices else 0
+        self._message_starts[doc_id].append(len(stream) // TERM_ID_WIDTH)
+        indices.append(message_index)
+
+        term_ids = array("I", map(self._term_id, tokenize(content)))
+        stream += term_ids.tobytes()
+        counts: Dict[int, int] = {}
+        for term_id in term_ids:
+            counts[term_id] = counts.get(term_id, 0) + 1
+        self.total_length += len(term_ids)
+
+        for term_id, count in counts.items():
+            docs = self._postings[term_id]
+            i = bisect_left(docs, doc_id)
+            if i < len(docs) and docs[i] == doc_id:
+                self._frequencies[term_id][i] += count
+            else:
+                # New sessions get the highest doc id, so this is nearly always an append
+                docs.insert(i, doc_id)
+                self._frequencies[term_id].insert(i, count)
+
+    def add_session(self, session_id: str, contents: Iterable[str]):
+        """Index every message text of a session (used when loading history)"""
+        for content in contents:
+            self.add_message(session_id, content)
+
+    def remove_session(self, session_id: str):
+        """Drop a session and its postings"""
+        doc_id = self._doc_ids.pop(session_id, None)
+        if doc_id is None:
+            return
+        stream = self._streams[doc_id]
+        with memoryview(stream) as raw, raw.cast("I") as term_ids:
+            distinct = set(term_ids)
+            self.total_length -= len(term_ids)
+        for term_id in distinct:
+            docs = self._postings[term_id]
+            i = bisect_left(docs, doc_id)
+            del docs[i]
+            del self._frequencies[term_id][i]
+        self._session_ids[doc_id] = None
+        self._streams[doc_id] = None
+        self._message_starts[doc_id] = None
+        self._message_indices[doc_id] = None
+
+    def clear(self):
+        self.__init__()
+
+    def _message_at(self, doc_id: int, offset: int) -> int:
+        """Index into the doc's message arrays for a stream offset"""
+        return bisect_right(self._message_starts[doc_id], offset) - 1
+
+    def _phrase_offsets(self, doc_id: int, pattern: bytes) -> List[int]:
+        """Stream offsets where the packed phrase starts and fits inside one message"""
+        stream = self._streams[doc_id]
+        starts = self._message_starts[doc_id]
+        length = len(pattern) // TERM_ID_WIDTH
+        offsets = []
+        i = stream.find(pattern)
+        while i != -1:
+            if i % TERM_ID_WIDTH:
+                i = stream.find(pattern, i + 1)
+                continue
+            offset = i // TERM_ID_WIDTH
+            message = self._message_at(doc_id, offset)
+            end = starts[message + 1] if message + 1 < len(starts) else len(stream) // TERM_ID_WIDTH
+            if offset + length <= end:
+                offsets.append(offset)
+            i = stream.find(pattern, i + TERM_ID_WIDTH)
+        return offsets
+
+    def _matching_messages(self, doc_id: int, clauses: List[List[int]]) -> List[int]:
+        indices = self._message_indices[doc_id]
+        matched = set()
+        singles = {clause[0] for clause in clauses if len(clause) == 1}
+        if singles:
+            with memoryview(self._streams[doc_id]) as raw, raw.cast("I") as term_ids:
+                for offset, term_id in enumerate(term_ids):
+                    if term_id in singles:
+                        matched.add(indices[self._message_at(doc_id, offset)])
+        for clause in clauses:
+            if len(clause) > 1:
+                pattern = array("I", clause).tobytes()
+                matched.update(
+                    indices[self._message_at(doc_id, offset)]
+                    for offset in self._phrase_offsets(doc_id, pattern)
+                )
+        return sorted(matched)
+
+    def _frequencies_in(self, term_id: int, candidates) -> Dict[int, int]:
+        """Term frequency for each candidate doc that contains the term"""
+        docs = self._postings[term_id]
+        frequencies = self._frequencies[term_id]
+        if len(candidates) * PROBE_RATIO < len(docs):
+            found = {}
+            for doc_id in candidates:
+                i = bisect_left(docs, doc_id)
+                if i < len(docs) and docs[i] == doc_id:
+                    found[doc_id] = frequencies[i]
+            return found
+        return {doc_id: tf for doc_id, tf in zip(docs, frequencies) if doc_id in candidates}
+
+    def search(self, query: str, limit: int = 10) -> List[Dict]:
+        """
+        Find sessions matching every term and phrase in the query, ranked by BM25
+
+        Args:
+            query: Terms and "quoted phrases", all of which must match
+            limit: Maximum number of results
+
+        Returns:
+            List of {'session_id', 'score', 'message_indices'} dicts, best first
+        """
+        clauses = []
+        for clause in parse_query(query):
+            term_ids = [self._term_ids.get(term) for term in clause]
+            if None in term_ids or not all(self._postings[term_id] for term_id in term_ids):
+                return []
+            clauses.append(term_ids)
+        if not clauses:
+            return []
+
+        # Every term must occur; intersect doc ids starting from the rarest term
+        ordered = sorted({term_id for clause in clauses for term_id in clause},
+                         key=lambda term_id: len(self._postings[term_id]))
+        rarest = ordered[0]
+        term_frequencies = {rarest: dict(zip(self._postings[rarest], self._frequencies[rarest]))}
+        candidates = term_frequencies[rarest].keys()
+        for term_id in ordered[1:]:
+            term_frequencies[term_id] = self._frequencies_in(term_id, candidates)
+            candidates = term_frequencies[term_id].keys()
+            if not candidates:
+                return []
+        candidates = set(candidates)
+
+        # Per-clause tf and df; phrases are only checked for surviving candidates
+        clause_stats = []
+        for clause in clauses:
+            if len(clause) == 1:
+                frequencies = term_frequencies[clause[0]]
+                df = len(self._postings[clause[0]])
+            else:
+                frequencies = {}
+                pattern = array("I", clause).tobytes()
+                for doc_id in candidates:
+                    count = len(self._phrase_offsets(doc_id, pattern))
+                    if count:
+                        frequencies[doc_id] = count
+                candidates.intersection_update(frequencies)
+                if not candidates:
+                    return []
+                # Phrase document frequency is bounded by its rarest term
+                df = min(len(self._postings[term_id]) for term_id in clause)
+            clause_stats.append((frequencies, math.log(1 + (len(self) - df + 0.5) / (df + 0.5))))
+
+        avg_bytes = self.total_length * TERM_ID_WIDTH / len(self) or 1.0
+        streams = self._streams
+        scores = {}
+        for doc_id in candidates:
+            length_norm = K1 * (1 - B + B * len(streams[doc_id]) / avg_bytes)
+            score = 0.0
+            for frequencies, idf in clause_stats:
+                tf = frequencies[doc_id]
+                score += idf * tf * (K1 + 1) / (tf + length_norm)
+            scores[doc_id] = score
+
+        return [
+            {
+                "session_id": self._session_ids[doc_id],
+                "score": scores[doc_id],
+                "message_indices": self._matching_messages(doc_id, clauses)
+            }
+            for doc_id in heapq.nlargest(limit, scores, key=scores.get)
+        ]